@@ -1,222 +1,190 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Blueprint, request, jsonify, g
 from flask_cors import CORS
 import json
 import uuid
-from datetime import datetime
-import sqlite3
+from functools import lru_cache
 import os
+import time
+
+from db import transaction
+
+from rate_limit import (RateLimiter, LoadShedder, retry_after_header,
+                        PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_CRITICAL)
+import wire_format
+from inventory import OutOfStock
+from table_sessions import valid_table_number, MIN_TABLE_NUMBER, MAX_TABLE_NUMBER
+from stores import StoreRegistry, DEFAULT_STORE_ID
 
 app = Flask(__name__)
 CORS(app) 
 
-# Database initialization
-def init_db():
-    """Initialize the SQLite database with required tables"""
-    conn = sqlite3.connect('cafe_orders.db')
-    cursor = conn.cursor()
-
-    # Create orders table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            id TEXT PRIMARY KEY,
-            customer_name TEXT,
-            table_number INTEGER,
-            items TEXT,
-            total_amount REAL,
-            status TEXT DEFAULT 'pending',
-            order_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            estimated_time INTEGER DEFAULT 15
-        )
-    ''')
-
-    # Create menu_items table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS menu_items (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            description TEXT,
-            price REAL NOT NULL,
-            category TEXT NOT NULL,
-            available BOOLEAN DEFAULT 1,
-            image_url TEXT
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
-
-# Initialize database on startup
-init_db()
-
-# Menu data - same as frontend
-MENU_DATA = {
-    "coffee": {
-        "title": "Coffee & Espresso",
-        "icon": "☕",
-        "items": [
-            {"id": "americano", "name": "Americano", "description": "Rich espresso with hot water", "price": 120, "image": "☕"},
-            {"id": "latte", "name": "Latte", "description": "Creamy espresso with steamed milk", "price": 150, "image": "🥛"},
-            {"id": "cappuccino", "name": "Cappuccino", "description": "Perfect balance of espresso, steamed milk and foam", "price": 140, "image": "☕"},
-            {"id": "mocha", "name": "Mocha", "description": "Chocolate and espresso blend with steamed milk", "price": 170, "image": "🍫"},
-            {"id": "espresso", "name": "Espresso", "description": "Pure, concentrated coffee shot", "price": 100, "image": "☕"},
-            {"id": "flatwhite", "name": "Flat White", "description": "Double espresso with microfoam milk", "price": 160, "image": "🥛"}
-        ]
-    },
-    "cold": {
-        "title": "Cold Beverages", 
-        "icon": "🧊",
-        "items": [
-            {"id": "iced-americano", "name": "Iced Americano", "description": "Chilled espresso with cold water", "price": 130, "image": "🧊"},
-            {"id": "iced-latte", "name": "Iced Latte", "description": "Cold espresso with milk over ice", "price": 160, "image": "🥤"},
-            {"id": "cold-brew", "name": "Cold Brew", "description": "Smooth, slow-brewed cold coffee", "price": 140, "image": "🧊"},
-            {"id": "frappe", "name": "Frappe", "description": "Blended iced coffee drink", "price": 180, "image": "🥤"},
-            {"id": "iced-mocha", "name": "Iced Mocha", "description": "Cold chocolate coffee delight", "price": 190, "image": "🍫"}
-        ]
-    },
-    "tea": {
-        "title": "Tea & Other Drinks",
-        "icon": "🍵",
-        "items": [
-            {"id": "masala-chai", "name": "Masala Chai", "description": "Traditional spiced Indian tea", "price": 80, "image": "🍵"},
-            {"id": "green-tea", "name": "Green Tea", "description": "Light and refreshing antioxidant tea", "price": 70, "image": "🍃"},
-            {"id": "earl-grey", "name": "Earl Grey", "description": "Classic black tea with bergamot", "price": 90, "image": "🍵"},
-            {"id": "hot-chocolate", "name": "Hot Chocolate", "description": "Rich cocoa with steamed milk", "price": 120, "image": "☕"},
-            {"id": "matcha-latte", "name": "Matcha Latte", "description": "Japanese green tea with steamed milk", "price": 180, "image": "🍃"}
-        ]
-    },
-    "pastries": {
-        "title": "Pastries & Baked Goods",
-        "icon": "🥐",
-        "items": [
-            {"id": "chocolate-croissant", "name": "Chocolate Croissant", "description": "Buttery croissant with chocolate", "price": 80, "image": "🥐"},
-            {"id": "blueberry-muffin", "name": "Blueberry Muffin", "description": "Fresh baked with real blueberries", "price": 70, "image": "🧁"},
-            {"id": "chocolate-chip-cookie", "name": "Chocolate Chip Cookie", "description": "Warm, gooey classic cookie", "price": 50, "image": "🍪"},
-            {"id": "red-velvet-cupcake", "name": "Red Velvet Cupcake", "description": "Moist cake with cream cheese frosting", "price": 90, "image": "🧁"},
-            {"id": "banana-bread", "name": "Banana Bread", "description": "Homemade moist banana bread slice", "price": 60, "image": "🍞"}
-        ]
-    },
-    "breakfast": {
-        "title": "Breakfast & Light Meals",
-        "icon": "🍽️", 
-        "items": [
-            {"id": "avocado-toast", "name": "Avocado Toast", "description": "Smashed avocado on artisan bread", "price": 180, "image": "🥑"},
-            {"id": "grilled-sandwich", "name": "Grilled Sandwich", "description": "Cheese and vegetable grilled sandwich", "price": 120, "image": "🥪"},
-            {"id": "caesar-salad", "name": "Caesar Salad", "description": "Crisp lettuce with parmesan and croutons", "price": 160, "image": "🥗"},
-            {"id": "breakfast-bagel", "name": "Breakfast Bagel", "description": "Everything bagel with cream cheese", "price": 100, "image": "🥯"},
-            {"id": "pancakes", "name": "Pancakes", "description": "Fluffy pancakes with maple syrup", "price": 140, "image": "🥞"}
-        ]
-    }
+# Always send compact JSON, even when running with debug=True
+app.json.compact = True
+
+# Rate limiting - (tokens per second, burst) per client and route
+RATE_LIMITS = {
+    "read": (5, 20),
+    "write": (1, 10)
 }
 
+# Load shedding thresholds
+MAX_PENDING_WRITES = 8
+MAX_LATENCY_SECONDS = 0.5
+
+# Endpoints that are shed first (analytics) or last (order creation) when overloaded
+ENDPOINT_PRIORITY = {
+    "get_stats": PRIORITY_LOW,
+    "get_store_report": PRIORITY_LOW,
+    "create_order": PRIORITY_CRITICAL
+}
+
+rate_limiter = RateLimiter(RATE_LIMITS)
+# Used for routes that are not tied to one store (e.g. cross-store reports)
+load_shedder = LoadShedder(max_pending_writes=MAX_PENDING_WRITES, max_latency=MAX_LATENCY_SECONDS)
+
+def too_many_requests(message, retry_after):
+    response = jsonify({"error": message})
+    response.status_code = 429
+    response.headers['Retry-After'] = retry_after_header(retry_after)
+    return response
+
+def current_shedder():
+    store = g.get('store')
+    return store.load_shedder if store is not None else load_shedder
+
+@app.before_request
+def admit_request():
+    """Shed load when overloaded and apply per-client token buckets"""
+    if request.method == 'OPTIONS' or request.endpoint in (None, 'index', 'static'):
+        return None
+
+    g.request_started = time.monotonic()
+
+    # Store routes are registered twice (api.* and store_api.*); priorities use the view name
+    view = request.endpoint.rsplit('.', 1)[-1]
+    priority = ENDPOINT_PRIORITY.get(view, PRIORITY_NORMAL)
+    retry_after = current_shedder().check(priority)
+    if retry_after:
+        return too_many_requests("Server is busy, please retry shortly", retry_after)
+
+    # Budgets are per store and view, however the store was addressed
+    store = g.get('store')
+    route = (store.id, view) if store is not None else request.endpoint
+    kind = "read" if request.method in ('GET', 'HEAD') else "write"
+    retry_after = rate_limiter.check(request.remote_addr, route, kind)
+    if retry_after:
+        return too_many_requests("Too many requests, please slow down", retry_after)
+
+    return None
+
+@app.after_request
+def record_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        current_shedder().record_latency(time.monotonic() - started)
+    return response
+
+@app.after_request
+def compress_response(response):
+    return wire_format.compress_response(response)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = 'cafe_orders.db'
+
+# Multi-store setup: stores.json lists the café locations, each with its own
+# SQLite database (shard). CAFE_STORES=main,branch-2 restricts the stores this
+# process serves, so locations can be spread across processes.
+stores = StoreRegistry(
+    os.path.join(BASE_DIR, 'stores.json'),
+    default_db_path=DB_PATH,
+    default_menu_path=os.path.join(BASE_DIR, 'menu.json'),
+    store_dir='stores',
+    served=[s for s in os.environ.get('CAFE_STORES', '').split(',') if s],
+    shedder_options={"max_pending_writes": MAX_PENDING_WRITES, "max_latency": MAX_LATENCY_SECONDS}
+)
+
+# API routes for one store. Registered at /api (the default store) and at
+# /api/stores/<store_id>/ (any store).
+api = Blueprint('api', __name__)
+
+@api.url_value_preprocessor
+def pull_store(endpoint, values):
+    store_id = values.pop('store_id', DEFAULT_STORE_ID) if values else DEFAULT_STORE_ID
+    g.store = stores.get(store_id)
+
+@api.before_request
+def require_store():
+    if g.store is None:
+        return jsonify({"error": "Store not found"}), 404
+    return None
+
+@lru_cache(maxsize=None)
+def get_docs_html():
+    with open(os.path.join(BASE_DIR, 'docs.html'), encoding='utf-8') as f:
+        return f.read().encode('utf-8')
+
 @app.route('/')
 def index():
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>First Cup Coffee - Backend API</title>
-        <style>
-            body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; 
-                   max-width: 800px; margin: 0 auto; padding: 20px; line-height: 1.6; color: #333; }
-            .header { text-align: center; margin-bottom: 30px; }
-            .endpoint { background: #f8f9fa; padding: 20px; margin: 15px 0; border-radius: 8px; 
-                       border-left: 4px solid #007bff; }
-            .method { display: inline-block; padding: 4px 8px; border-radius: 4px; font-weight: bold; 
-                     color: white; font-size: 12px; margin-bottom: 10px; }
-            .get { background: #28a745; }
-            .post { background: #007bff; }
-            .put { background: #ffc107; color: #212529; }
-            code { background: #e9ecef; padding: 2px 6px; border-radius: 3px; font-family: monospace; }
-            .status { background: #d4edda; padding: 15px; border-radius: 5px; margin: 20px 0; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>☕ First Cup Coffee - Backend API</h1>
-            <p>Flask backend server for the cafe ordering system</p>
-        </div>
-
-        <div class="status">
-            <h3>🚀 Server Status: Running</h3>
-            <p>Database initialized with orders and menu_items tables</p>
-        </div>
-
-        <h2>📋 API Endpoints</h2>
-
-        <div class="endpoint">
-            <span class="method get">GET</span>
-            <h3>/api/menu</h3>
-            <p>Get the complete menu with all categories and items</p>
-        </div>
-
-        <div class="endpoint">
-            <span class="method get">GET</span>
-            <h3>/api/menu/&lt;category&gt;</h3>
-            <p>Get menu items for a specific category</p>
-            <p>Categories: coffee, cold, tea, pastries, breakfast</p>
-        </div>
-
-        <div class="endpoint">
-            <span class="method post">POST</span>
-            <h3>/api/orders</h3>
-            <p>Create a new order</p>
-            <p>Request body: <code>{"items": [...], "table_number": 5, "customer_name": "Optional"}</code></p>
-        </div>
-
-        <div class="endpoint">
-            <span class="method get">GET</span>
-            <h3>/api/orders</h3>
-            <p>Get all orders (for kitchen display system)</p>
-        </div>
-
-        <div class="endpoint">
-            <span class="method get">GET</span>
-            <h3>/api/orders/&lt;order_id&gt;</h3>
-            <p>Get specific order details by ID</p>
-        </div>
-
-        <div class="endpoint">
-            <span class="method put">PUT</span>
-            <h3>/api/orders/&lt;order_id&gt;/status</h3>
-            <p>Update order status (for kitchen staff)</p>
-            <p>Request body: <code>{"status": "preparing|ready|completed"}</code></p>
-        </div>
-
-        <div class="endpoint">
-            <span class="method get">GET</span>
-            <h3>/api/stats</h3>
-            <p>Get daily statistics (total orders, revenue, status breakdown)</p>
-        </div>
-
-        <h2>🔧 Usage Instructions</h2>
-        <ol>
-            <li>Install dependencies: <code>pip install flask flask-cors</code></li>
-            <li>Run the server: <code>python app.py</code></li>
-            <li>The API will be available at <code>http://localhost:5000</code></li>
-            <li>Serve your frontend web app separately or integrate with this Flask app</li>
-        </ol>
-
-        <h2>📱 Frontend Integration</h2>
-        <p>This backend is designed to work with the First Cup Coffee web ordering interface. 
-           Configure your frontend to make API calls to these endpoints.</p>
-    </body>
-    </html>
-    '''
-    return html
-
-@app.route('/api/menu')
+    return wire_format.render_static(get_docs_html(), 'text/html', cache_key='docs')
+
+@api.route('/menu')
 def get_menu():
-    return jsonify(MENU_DATA)
+    store = g.store
+    return wire_format.render(store.live_menu(), cache_key=store.cache_key('menu'))
 
-@app.route('/api/menu/<category>')
+@api.route('/menu/<category>')
 def get_category_menu(category):
-    if category in MENU_DATA:
-        return jsonify(MENU_DATA[category])
+    store = g.store
+    menu = store.live_menu()
+    if category in menu:
+        return wire_format.render(menu[category], cache_key=store.cache_key('menu/' + category))
     else:
         return jsonify({"error": "Category not found"}), 404
 
-@app.route('/api/orders', methods=['POST'])
+@app.route('/api/wire/keys')
+def get_compact_keys():
+    return jsonify(wire_format.COMPACT_KEYS)
+
+# SQL used on the hot paths. Pooled connections keep these compiled in
+# sqlite3's statement cache, keyed by the exact SQL text.
+ORDER_COLUMNS = 'id, customer_name, table_number, items, total_amount, status, order_time, estimated_time'
+
+INSERT_ORDER_SQL = '''
+    INSERT INTO orders (id, customer_name, table_number, items, total_amount, estimated_time, session_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SELECT_ORDERS_SQL = f'''
+    SELECT {ORDER_COLUMNS}
+    FROM orders
+    ORDER BY order_time DESC
+'''
+
+SELECT_ORDER_SQL = f'''
+    SELECT {ORDER_COLUMNS}
+    FROM orders
+    WHERE id = ?
+'''
+
+SELECT_ORDER_STATUS_SQL = 'SELECT status, session_id, items, total_amount FROM orders WHERE id = ?'
+
+UPDATE_STATUS_SQL = 'UPDATE orders SET status = ? WHERE id = ?'
+
+def row_to_order(row):
+    return {
+        "id": row[0],
+        "customer_name": row[1],
+        "table_number": row[2],
+        "items": json.loads(row[3]),
+        "total_amount": row[4],
+        "status": row[5],
+        "order_time": row[6],
+        "estimated_time": row[7]
+    }
+
+@api.route('/orders', methods=['POST'])
 def create_order():
+    store = g.store
     try:
         data = request.get_json()
 
@@ -224,113 +192,87 @@ def create_order():
             return jsonify({"error": "Missing required fields: items, table_number"}), 400
 
         table_number = data.get('table_number')
-        if not isinstance(table_number, int) or table_number < 1 or table_number > 50:
-            return jsonify({"error": "Table number must be between 1 and 50"}), 400
+        if not valid_table_number(table_number):
+            return jsonify({"error": f"Table number must be between {MIN_TABLE_NUMBER} and {MAX_TABLE_NUMBER}"}), 400
 
         order_id = str(uuid.uuid4())[:8].upper()
 
-        total_amount = 0
-        for item in data['items']:
-            total_amount += item.get('price', 0) * item.get('quantity', 1)
-
-        item_count = sum(item.get('quantity', 1) for item in data['items'])
-        estimated_time = 5 + (item_count * 2)
-
-        conn = sqlite3.connect('cafe_orders.db')
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO orders (id, customer_name, table_number, items, total_amount, estimated_time)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            order_id,
-            data.get('customer_name', ''),
-            table_number,
-            json.dumps(data['items']),
-            total_amount,
-            estimated_time
-        ))
-
-        conn.commit()
-        conn.close()
-
-        return jsonify({
+        with store.load_shedder.track_write(), store.db_pool.connection() as conn, transaction(conn):
+            # With allow_partial, quantities are cut to the stock left instead of rejecting the order
+            items, unavailable, stock_changes = store.inventory.reserve(conn, data['items'],
+                                                                  allow_partial=bool(data.get('allow_partial')))
+            if unavailable and not items:
+                raise OutOfStock(unavailable)
+
+            total_amount = 0
+            for item in items:
+                total_amount += item.get('price', 0) * item.get('quantity', 1)
+
+            item_count = sum(item.get('quantity', 1) for item in items)
+            estimated_time = 5 + (item_count * 2)
+
+            tab = store.table_tabs.add_order(conn, table_number, total_amount, item_count)
+            conn.execute(INSERT_ORDER_SQL, (
+                order_id,
+                data.get('customer_name', ''),
+                table_number,
+                json.dumps(items, separators=(',', ':')),
+                total_amount,
+                estimated_time,
+                tab["session_id"]
+            ))
+        store.table_tabs.remember(tab)
+        store.menu_changed(store.inventory.record(stock_changes))
+
+        response = {
             "success": True,
             "order_id": order_id,
             "total_amount": total_amount,
             "estimated_time": estimated_time,
+            "tab_total": tab["total_amount"],
             "message": "Order placed successfully!"
-        })
+        }
+        if unavailable:
+            response["unavailable"] = unavailable
+            response["message"] = "Order placed, but some items were out of stock"
+        return jsonify(response)
+
+    except OutOfStock as e:
+        return jsonify({"error": str(e), "unavailable": e.shortfalls}), 409
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/orders', methods=['GET'])
+@api.route('/orders', methods=['GET'])
 def get_orders():
+    store = g.store
     try:
-        conn = sqlite3.connect('cafe_orders.db')
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT id, customer_name, table_number, items, total_amount, status, order_time, estimated_time
-            FROM orders
-            ORDER BY order_time DESC
-        ''')
-
-        orders = []
-        for row in cursor.fetchall():
-            orders.append({
-                "id": row[0],
-                "customer_name": row[1],
-                "table_number": row[2],
-                "items": json.loads(row[3]),
-                "total_amount": row[4],
-                "status": row[5],
-                "order_time": row[6],
-                "estimated_time": row[7]
-            })
-
-        conn.close()
-        return jsonify(orders)
+        with store.db_pool.connection() as conn:
+            orders = [row_to_order(row) for row in conn.execute(SELECT_ORDERS_SQL)]
+
+        return wire_format.render(orders)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/orders/<order_id>')
+@api.route('/orders/<order_id>')
 def get_order(order_id):
+    store = g.store
     try:
-        conn = sqlite3.connect('cafe_orders.db')
-        cursor = conn.cursor()
+        with store.db_pool.connection() as conn:
+            row = conn.execute(SELECT_ORDER_SQL, (order_id,)).fetchone()
 
-        cursor.execute('''
-            SELECT id, customer_name, table_number, items, total_amount, status, order_time, estimated_time
-            FROM orders
-            WHERE id = ?
-        ''', (order_id,))
-
-        row = cursor.fetchone()
         if not row:
             return jsonify({"error": "Order not found"}), 404
 
-        order = {
-            "id": row[0],
-            "customer_name": row[1],
-            "table_number": row[2],
-            "items": json.loads(row[3]),
-            "total_amount": row[4],
-            "status": row[5],
-            "order_time": row[6],
-            "estimated_time": row[7]
-        }
-
-        conn.close()
-        return jsonify(order)
+        return wire_format.render(row_to_order(row))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/orders/<order_id>/status', methods=['PUT'])
+@api.route('/orders/<order_id>/status', methods=['PUT'])
 def update_order_status(order_id):
+    store = g.store
     try:
         data = request.get_json()
         if not data or 'status' not in data:
@@ -340,56 +282,190 @@ def update_order_status(order_id):
         if data['status'] not in valid_statuses:
             return jsonify({"error": f"Status must be one of: {valid_statuses}"}), 400
 
-        conn = sqlite3.connect('cafe_orders.db')
-        cursor = conn.cursor()
+        tab = None
+        stock_changes = {}
+        with store.load_shedder.track_write(), store.db_pool.connection() as conn, transaction(conn):
+            row = conn.execute(SELECT_ORDER_STATUS_SQL, (order_id,)).fetchone()
+            if not row:
+                return jsonify({"error": "Order not found"}), 404
+
+            old_status, session_id, items, amount = row
+            conn.execute(UPDATE_STATUS_SQL, (data['status'], order_id))
+
+            # Cancelled orders come off the table's tab and give their stock back
+            # (and take both again if un-cancelled)
+            if (old_status == 'cancelled') != (data['status'] == 'cancelled'):
+                sign = -1 if data['status'] == 'cancelled' else 1
+                items = json.loads(items)
+                if sign < 0:
+                    stock_changes = store.inventory.release(conn, items)
+                else:
+                    _, _, stock_changes = store.inventory.reserve(conn, items)
+                if session_id:
+                    item_count = sum(item.get('quantity', 1) for item in items)
+                    tab = store.table_tabs.adjust(conn, session_id, sign, sign * item_count, sign * amount)
+
+        if tab is not None:
+            store.table_tabs.remember(tab)
+        store.menu_changed(store.inventory.record(stock_changes))
 
-        cursor.execute('UPDATE orders SET status = ? WHERE id = ?', (data['status'], order_id))
+        return jsonify({"success": True, "message": f"Order status updated to {data['status']}"})
 
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Order not found"}), 404
+    except OutOfStock as e:
+        return jsonify({"error": str(e), "unavailable": e.shortfalls}), 409
 
-        conn.commit()
-        conn.close()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        return jsonify({"success": True, "message": f"Order status updated to {data['status']}"})
+@api.route('/inventory')
+def get_inventory():
+    store = g.store
+    try:
+        # Re-read menu_items when the in-memory counters are stale
+        store.menu_changed(store.inventory.sync(store.menu(), store.db_pool.connection))
+        return jsonify(store.inventory.snapshot())
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/stats')
-def get_stats():
+@api.route('/inventory/<item_id>', methods=['PUT'])
+def update_inventory(item_id):
+    store = g.store
     try:
-        conn = sqlite3.connect('cafe_orders.db')
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT COUNT(*), COALESCE(SUM(total_amount), 0)
-            FROM orders
-            WHERE date(order_time) = date('now')
-        ''')
-        today_stats = cursor.fetchone()
-
-        cursor.execute('''
-            SELECT status, COUNT(*)
-            FROM orders
-            WHERE date(order_time) = date('now')
-            GROUP BY status
-        ''')
-        status_stats = dict(cursor.fetchall())
-
-        conn.close()
+        data = request.get_json()
+        if not data or ('stock' not in data and 'available' not in data):
+            return jsonify({"error": "Provide stock and/or available"}), 400
+
+        fields = {}
+        if 'stock' in data:
+            stock = data['stock']
+            if stock is not None and (not isinstance(stock, int) or isinstance(stock, bool) or stock < 0):
+                return jsonify({"error": "Stock must be a non-negative integer or null (not tracked)"}), 400
+            fields['stock'] = stock
+        if 'available' in data:
+            if not isinstance(data['available'], bool):
+                return jsonify({"error": "Available must be true or false"}), 400
+            fields['available'] = data['available']
+
+        category, item = store.find_menu_item(item_id)
+        if item is None:
+            return jsonify({"error": "Menu item not found"}), 404
+
+        with store.load_shedder.track_write(), store.db_pool.connection() as conn, transaction(conn):
+            changes = store.inventory.set_item(conn, item, category, **fields)
+        store.menu_changed(store.inventory.record(changes))
+
+        available, stock = changes[item_id]
+        return jsonify({"success": True, "id": item_id, "available": available, "stock": stock})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+def check_table_number(table_number):
+    if not valid_table_number(table_number):
+        return jsonify({"error": f"Table number must be between {MIN_TABLE_NUMBER} and {MAX_TABLE_NUMBER}"}), 400
+    return None
+
+@api.route('/tables')
+def get_tables():
+    store = g.store
+    try:
+        tabs = store.table_tabs.overview(store.db_pool.connection)
         return jsonify({
-            "today": {
-                "total_orders": today_stats[0] or 0,
-                "total_revenue": today_stats[1] or 0
-            },
-            "status_breakdown": status_stats
+            "total_tables": MAX_TABLE_NUMBER - MIN_TABLE_NUMBER + 1,
+            "occupied": len(tabs),
+            "tabs": tabs
         })
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api.route('/tables/<int:table_number>/tab', methods=['GET'])
+def get_table_tab(table_number):
+    store = g.store
+    error = check_table_number(table_number)
+    if error:
+        return error
+
+    try:
+        tab = store.table_tabs.get_tab(store.db_pool.connection, table_number)
+        if tab is None:
+            return jsonify({"error": "No open tab for this table"}), 404
+        return jsonify(tab)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tables/<int:table_number>/tab', methods=['POST'])
+def open_table_tab(table_number):
+    store = g.store
+    error = check_table_number(table_number)
+    if error:
+        return error
+
+    try:
+        with store.load_shedder.track_write(), store.db_pool.connection() as conn, transaction(conn):
+            tab = store.table_tabs.open_tab(conn, table_number)
+        store.table_tabs.remember(tab)
+        return jsonify(tab)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tables/<int:table_number>/tab/close', methods=['POST'])
+def close_table_tab(table_number):
+    store = g.store
+    error = check_table_number(table_number)
+    if error:
+        return error
+
+    try:
+        with store.load_shedder.track_write(), store.db_pool.connection() as conn, transaction(conn):
+            tab = store.table_tabs.close_tab(conn, table_number)
+        if tab is None:
+            return jsonify({"error": "No open tab for this table"}), 404
+
+        store.table_tabs.remember(tab)
+        return jsonify({"success": True, "tab": tab})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/stats')
+def get_stats():
+    store = g.store
+    try:
+        return jsonify(store.today_stats())
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+app.register_blueprint(api, url_prefix='/api')
+app.register_blueprint(api, url_prefix='/api/stores/<store_id>', name='store_api')
+
+@app.route('/api/stores')
+def get_stores():
+    return jsonify([{"id": store_id, "name": options.get("name", store_id)}
+                    for store_id, options in sorted(stores.config.items())])
+
+@app.route('/api/reports/stores')
+def get_store_report():
+    """Today's stats for every store, fanned out to the shards in parallel
+
+    Overloaded shards are left out of the report; when every shard is
+    overloaded the request is rejected with 429.
+    """
+    try:
+        report = stores.report(priority=PRIORITY_LOW)
+        busy = [result["retry_after"] for result in report["stores"] if result.get("busy")]
+        if busy and len(busy) == len(report["stores"]):
+            return too_many_requests("All stores are busy, please retry shortly", min(busy))
+        report["partial"] = bool(busy)
+        return jsonify(report)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
     print("\n🚀 Starting First Cup Coffee Backend Server...")
     print("📱 Frontend: Deploy the web app separately")
@@ -0,0 +1,54 @@
+# Measure cold start: time to import app.py and to serve the first requests.
+# Each run uses a fresh interpreter and a fresh working directory (so a new
+# cafe_orders.db) to mimic a newly spawned worker.
+#
+# Usage: python bench_startup.py [runs]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CHILD = '''
+import json, sys, time
+sys.path.insert(0, %r)
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+client.get('/api/menu')
+t2 = time.perf_counter()
+client.get('/api/orders')
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_menu": t2 - t1, "first_orders": t3 - t2}))
+''' % BACKEND_DIR
+
+
+def run_once(workdir):
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=workdir, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    cold, warm = [], []
+
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            # First spawn creates the database, the second finds it current
+            cold.append(run_once(workdir))
+            warm.append(run_once(workdir))
+
+    print(f"Startup benchmark ({runs} runs, median ms)")
+    for label, samples in (("new database", cold), ("existing database", warm)):
+        print(f"  {label}:")
+        for key in ("import", "first_menu", "first_orders"):
+            print(f"    {key:<14} {statistics.median(s[key] for s in samples) * 1000:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
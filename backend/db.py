@@ -0,0 +1,84 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT, rolling back on error
+
+    Taking the write lock up front means reads made inside the block cannot
+    be invalidated by another writer before our own writes land.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class ConnectionPool:
+    """A small pool of SQLite connections for one database file
+
+    Reusing connections keeps sqlite3's per-connection statement cache warm, so
+    the queries in app.py are only compiled once per connection instead of on
+    every request. The initializer (schema setup) runs lazily, once, the first
+    time a connection is needed.
+    """
+
+    def __init__(self, path, size=8, initializer=None, cached_statements=128, timeout=5.0):
+        self.path = path
+        self.size = size
+        self.initializer = initializer
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._init_lock = threading.Lock()
+        self._initialized = initializer is None
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+
+    def _ensure_initialized(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn = self._connect()
+            try:
+                self.initializer(conn)
+                conn.commit()
+            finally:
+                conn.close()
+            self._initialized = True
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; uncommitted work is rolled back when it is returned"""
+        self._ensure_initialized()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
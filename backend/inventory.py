@@ -0,0 +1,216 @@
+import threading
+import time
+
+# How often the in-memory availability is re-read from menu_items, to pick up
+# changes made by other worker processes. Changes made by this process are
+# applied immediately.
+REFRESH_INTERVAL_SECONDS = 5.0
+
+SELECT_INVENTORY_SQL = 'SELECT id, stock, available FROM menu_items'
+
+DECREMENT_STOCK_SQL = 'UPDATE menu_items SET stock = stock - ? WHERE id = ? AND stock >= ?'
+
+INCREMENT_STOCK_SQL = 'UPDATE menu_items SET stock = stock + ? WHERE id = ? AND stock IS NOT NULL'
+
+INSERT_MENU_ITEM_SQL = '''
+    INSERT OR IGNORE INTO menu_items (id, name, description, price, category, image_url)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def _effective(available, stock):
+    return available and (stock is None or stock > 0)
+
+
+def _quantities(items):
+    wanted = {}
+    for item in items:
+        if item.get('id'):
+            wanted[item['id']] = wanted.get(item['id'], 0) + item.get('quantity', 1)
+    return wanted
+
+
+class OutOfStock(Exception):
+    def __init__(self, shortfalls):
+        super().__init__("Some items are out of stock")
+        self.shortfalls = shortfalls
+
+
+class Inventory:
+    """Per-item stock counters and availability
+
+    Stock lives in menu_items.stock (NULL means not tracked, i.e. unlimited)
+    and menu_items.available is a manual on/off switch. Decrements happen in
+    the same transaction as the order insert, so they add one short UPDATE
+    per tracked item to a write the order already makes rather than a
+    separate transaction per order.
+
+    The served menu is patched in place: every item carries an "available"
+    key, rewritten only when an item sells out or comes back. Stock counts
+    stay out of the menu (see snapshot()), so ordinary decrements do not
+    invalidate cached menu responses.
+    """
+
+    def __init__(self, refresh_interval=REFRESH_INTERVAL_SECONDS, clock=time.monotonic):
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._state = {}
+        # Bumped by every record(), so sync() can tell which entries are newer than its read
+        self._version = 0
+        self._index = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    # Orders (run inside the order's transaction)
+
+    def reserve(self, conn, items, allow_partial=False):
+        """Decrement stock for the ordered items
+
+        Returns (accepted_items, shortfalls, changes). Raises OutOfStock when
+        something is short and allow_partial is false; with allow_partial,
+        quantities are cut down to what is left. `changes` must be passed to
+        record() once the transaction has committed.
+        """
+        wanted = _quantities(items)
+
+        rows = {}
+        if wanted:
+            placeholders = ', '.join('?' * len(wanted))
+            for item_id, stock, available in conn.execute(
+                    f'{SELECT_INVENTORY_SQL} WHERE id IN ({placeholders})', list(wanted)):
+                rows[item_id] = (stock, bool(available))
+
+        granted = {}
+        shortfalls = []
+        for item_id, quantity in wanted.items():
+            if item_id not in rows:
+                continue
+            stock, available = rows[item_id]
+            if not available:
+                granted[item_id] = 0
+            elif stock is None:
+                continue
+            else:
+                granted[item_id] = max(0, min(quantity, stock))
+            if granted[item_id] < quantity:
+                shortfalls.append({"id": item_id, "requested": quantity, "available": granted[item_id]})
+
+        if shortfalls and not allow_partial:
+            raise OutOfStock(shortfalls)
+
+        accepted = []
+        remaining = dict(granted)
+        for item in items:
+            item_id = item.get('id')
+            if item_id in remaining:
+                quantity = min(item.get('quantity', 1), remaining[item_id])
+                remaining[item_id] -= quantity
+                if quantity <= 0:
+                    continue
+                if quantity != item.get('quantity', 1):
+                    item = dict(item, quantity=quantity)
+            accepted.append(item)
+
+        changes = {}
+        for item_id, quantity in granted.items():
+            stock, available = rows[item_id]
+            if stock is None or quantity == 0:
+                continue
+            conn.execute(DECREMENT_STOCK_SQL, (quantity, item_id, quantity))
+            changes[item_id] = (available, stock - quantity)
+
+        return accepted, shortfalls, changes
+
+    def release(self, conn, items):
+        """Give back the stock an order's items took, e.g. when it is cancelled
+
+        Untracked items are left alone. Returns changes for record().
+        """
+        wanted = _quantities(items)
+        if not wanted:
+            return {}
+
+        placeholders = ', '.join('?' * len(wanted))
+        changes = {}
+        for item_id, stock, available in conn.execute(
+                f'{SELECT_INVENTORY_SQL} WHERE id IN ({placeholders}) AND stock IS NOT NULL', list(wanted)).fetchall():
+            conn.execute(INCREMENT_STOCK_SQL, (wanted[item_id], item_id))
+            changes[item_id] = (bool(available), stock + wanted[item_id])
+        return changes
+
+    # Admin
+
+    def set_item(self, conn, item, category, **fields):
+        """Set stock and/or available for a menu item; returns changes for record()"""
+        conn.execute(INSERT_MENU_ITEM_SQL, (item["id"], item["name"], item.get("description"),
+                                            item["price"], category, item.get("image")))
+        for column in ('stock', 'available'):
+            if column in fields:
+                conn.execute(f'UPDATE menu_items SET {column} = ? WHERE id = ?', (fields[column], item["id"]))
+
+        stock, available = conn.execute('SELECT stock, available FROM menu_items WHERE id = ?',
+                                        (item["id"],)).fetchone()
+        return {item["id"]: (bool(available), stock)}
+
+    # Menu overlay
+
+    def record(self, changes):
+        """Apply committed changes; return the menu categories that were modified"""
+        with self._lock:
+            self._version += 1
+            return self._apply(changes, self._version)
+
+    def sync(self, menu, conn_factory):
+        """Attach availability to the menu, re-reading the database when stale
+
+        Returns the categories whose items changed (their cached responses
+        need invalidating).
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = {}
+                for category, data in menu.items():
+                    for item in data["items"]:
+                        self._index[item["id"]] = (category, item)
+                        # The key always exists, so readers serializing the menu never see it change size
+                        item["available"] = _effective(*self._state.get(item["id"], (True, None, 0))[:2])
+
+            fresh = self._loaded_at is not None and self.clock() - self._loaded_at < self.refresh_interval
+            if fresh:
+                return set()
+            version = self._version
+
+        started = self.clock()
+        with conn_factory() as conn:
+            rows = conn.execute(SELECT_INVENTORY_SQL).fetchall()
+
+        loaded = {item_id: (True, None) for item_id in self._index}
+        loaded.update({item_id: (bool(available), stock) for item_id, stock, available in rows})
+
+        with self._lock:
+            self._loaded_at = started
+            return self._apply(loaded, version)
+
+    def snapshot(self):
+        """Tracked or unavailable items as a list of dicts"""
+        with self._lock:
+            return [{"id": item_id, "available": _effective(available, stock), "stock": stock}
+                    for item_id, (available, stock, _) in sorted(self._state.items())
+                    if stock is not None or not available]
+
+    def _apply(self, changes, version):
+        changed = set()
+        for item_id, (available, stock) in changes.items():
+            previous = self._state.get(item_id, (True, None, 0))
+            # Skip entries recorded after `version` (e.g. an order committed
+            # while sync() was reading the table); they are newer than these changes
+            if previous[2] > version:
+                continue
+            self._state[item_id] = (available, stock, version)
+            if _effective(*previous[:2]) == _effective(available, stock):
+                continue
+            if self._index and item_id in self._index:
+                category, item = self._index[item_id]
+                item["available"] = _effective(available, stock)
+                changed.add(category)
+        return changed
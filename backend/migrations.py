@@ -0,0 +1,385 @@
+# Versioned schema migrations for cafe_orders.db
+#
+# Each migration has a number; the database's PRAGMA user_version records the
+# last one whose schema statements were applied. Schema statements for a
+# migration run in one transaction together with the version bump.
+#
+# Migrations that rewrite existing rows (backfills) are tracked separately in
+# migration_checkpoints, so a long backfill never holds back later schema
+# migrations. Backfills run in small batches, one transaction each, so order
+# writes can get the write lock between batches. Progress is checkpointed and
+# an interrupted backfill resumes where it stopped. The server only applies
+# schema statements on the request path and runs backfills in a background
+# thread; this CLI runs both.
+#
+# Usage: python migrations.py [--db cafe_orders.db] [--dry-run] [--target N] [--batch-size N] [--pause S]
+import argparse
+import json
+import math
+import sqlite3
+import time
+
+from db import transaction
+
+DEFAULT_BATCH_SIZE = 500
+
+# Rows sampled by --dry-run to estimate how long a migration will take
+ESTIMATE_SAMPLE_ROWS = 1000
+
+# Estimates for schema statements (e.g. CREATE INDEX) time a Python-side scan
+# of sample rows, which is much slower than SQLite's own index build. The
+# factor keeps the result a deliberately pessimistic upper bound.
+INDEX_BUILD_FACTOR = 3.0
+
+
+class Backfill:
+    """Rewrite rows of one table in rowid order, a batch per transaction
+
+    transform(row) receives the selected columns and returns a dict of new
+    column values, or None to leave the row unchanged.
+    """
+
+    def __init__(self, table, columns, transform):
+        self.table = table
+        self.columns = columns
+        self.transform = transform
+
+    def run_batch(self, conn, after_rowid, limit):
+        """Process up to `limit` rows after `after_rowid`; return (last_rowid, rows_seen)"""
+        rows = conn.execute(
+            f'SELECT rowid, {", ".join(self.columns)} FROM {self.table} '
+            f'WHERE rowid > ? ORDER BY rowid LIMIT ?', (after_rowid, limit)).fetchall()
+
+        for row in rows:
+            updates = self.transform(row[1:])
+            if updates:
+                assignments = ', '.join(f'{column} = ?' for column in updates)
+                conn.execute(f'UPDATE {self.table} SET {assignments} WHERE rowid = ?',
+                             (*updates.values(), row[0]))
+
+        return (rows[-1][0] if rows else after_rowid), len(rows)
+
+
+class Migration:
+    def __init__(self, version, description, statements=(), table=None, backfill=None):
+        # Statements should be idempotent (IF NOT EXISTS ..., add_column).
+        # A statement may also be a callable taking the connection. A backfill
+        # runs after later migrations may already be applied and while the
+        # server is taking orders, so the app must cope with unconverted rows.
+        self.version = version
+        self.description = description
+        self.statements = statements
+        self.table = table or (backfill.table if backfill else None)
+        self.backfill = backfill
+
+
+def add_column(table, column, definition):
+    """ALTER TABLE ... ADD COLUMN, skipped if the column already exists"""
+    def apply(conn):
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        if column not in columns:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return apply
+
+
+def _compact_items(row):
+    items = row[0]
+    try:
+        compact = json.dumps(json.loads(items), separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+    return {"items": compact} if compact != items else None
+
+
+MIGRATIONS = [
+    Migration(1, "Create orders and menu_items tables", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS orders (
+            id TEXT PRIMARY KEY,
+            customer_name TEXT,
+            table_number INTEGER,
+            items TEXT,
+            total_amount REAL,
+            status TEXT DEFAULT 'pending',
+            order_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            estimated_time INTEGER DEFAULT 15
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            price REAL NOT NULL,
+            category TEXT NOT NULL,
+            available BOOLEAN DEFAULT 1,
+            image_url TEXT
+        )
+        '''
+    ]),
+    Migration(2, "Index orders by order_time for the kitchen list and daily stats", table='orders', statements=[
+        'CREATE INDEX IF NOT EXISTS idx_orders_order_time ON orders (order_time)'
+    ]),
+    Migration(3, "Store order items as compact JSON",
+              backfill=Backfill('orders', ['items'], _compact_items)),
+    Migration(4, "Add table sessions (open tabs) and link orders to them", table='orders', statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS table_sessions (
+            id TEXT PRIMARY KEY,
+            table_number INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'open',
+            opened_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            closed_at TIMESTAMP,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0
+        )
+        ''',
+        # At most one open tab per table, and a direct lookup for it
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_table_sessions_open
+        ON table_sessions (table_number) WHERE status = 'open'
+        ''',
+        add_column('orders', 'session_id', 'TEXT'),
+        'CREATE INDEX IF NOT EXISTS idx_orders_session_id ON orders (session_id)'
+    ]),
+    Migration(5, "Add stock counters to menu_items", statements=[
+        # NULL means stock is not tracked for the item
+        add_column('menu_items', 'stock', 'INTEGER')
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def pending_migrations(conn, target=None):
+    current = get_version(conn)
+    target = LATEST_VERSION if target is None else target
+    return [m for m in MIGRATIONS if current < m.version <= target]
+
+
+def _ensure_checkpoint_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS migration_checkpoints (
+            version INTEGER PRIMARY KEY,
+            last_rowid INTEGER NOT NULL,
+            rows_done INTEGER NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # Tables created before backfills were tracked separately lack the column
+    add_column('migration_checkpoints', 'completed', 'INTEGER NOT NULL DEFAULT 0')(conn)
+
+
+def _load_checkpoint(conn, version):
+    row = conn.execute('SELECT last_rowid, rows_done FROM migration_checkpoints WHERE version = ?',
+                       (version,)).fetchone()
+    return row if row else (0, 0)
+
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone() is not None
+
+
+def pending_backfills(conn):
+    """Migrations whose schema is applied but whose backfill has not finished"""
+    if not _table_exists(conn, 'migration_checkpoints'):
+        return []
+
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(migration_checkpoints)')]
+    if 'completed' in columns:
+        sql = 'SELECT version FROM migration_checkpoints WHERE completed = 0'
+    else:
+        sql = 'SELECT version FROM migration_checkpoints'
+    versions = {row[0] for row in conn.execute(sql)}
+    return [m for m in MIGRATIONS if m.backfill is not None and m.version in versions]
+
+
+def apply_schema(conn, migration):
+    """Run a migration's schema statements and bump user_version
+
+    Returns False without doing anything if the database is already at or
+    past this version, e.g. because another worker migrated it after our
+    plan was made. The version is re-read under the write lock, so it can
+    never move backwards.
+    """
+    with transaction(conn):
+        if get_version(conn) >= migration.version:
+            return False
+
+        for statement in migration.statements:
+            if callable(statement):
+                statement(conn)
+            else:
+                conn.execute(statement)
+
+        if migration.backfill is not None:
+            _ensure_checkpoint_table(conn)
+            conn.execute('INSERT OR IGNORE INTO migration_checkpoints (version, last_rowid, rows_done) '
+                         'VALUES (?, 0, 0)', (migration.version,))
+
+        conn.execute(f'PRAGMA user_version = {migration.version}')
+    return True
+
+
+def run_backfill(conn, migration, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, log=None):
+    """Run a registered backfill to completion, a batch per transaction
+
+    The checkpoint is re-read inside every batch's transaction, so several
+    processes running the same backfill share the work instead of repeating it.
+    """
+    with transaction(conn):
+        _ensure_checkpoint_table(conn)
+
+    while True:
+        with transaction(conn):
+            row = conn.execute('SELECT last_rowid, rows_done, completed FROM migration_checkpoints '
+                               'WHERE version = ?', (migration.version,)).fetchone()
+            if row is None or row[2]:
+                return
+            last_rowid, rows_done = row[0], row[1]
+
+            last_rowid, seen = migration.backfill.run_batch(conn, last_rowid, batch_size)
+            rows_done += seen
+            done = seen < batch_size
+            conn.execute('UPDATE migration_checkpoints SET last_rowid = ?, rows_done = ?, completed = ? '
+                         'WHERE version = ?', (last_rowid, rows_done, int(done), migration.version))
+        if log and seen:
+            log(f"  migration {migration.version}: {rows_done} rows processed")
+        if done:
+            return
+        if pause:
+            # Give other writers a chance at the lock between batches
+            time.sleep(pause)
+
+
+def run_pending_backfills(path, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, log=None):
+    """Finish every pending backfill in the database at `path` on a connection of its own"""
+    conn = sqlite3.connect(path, timeout=30.0)
+    try:
+        for migration in pending_backfills(conn):
+            run_backfill(conn, migration, batch_size=batch_size, pause=pause, log=log)
+    finally:
+        conn.close()
+
+
+def estimate_migration(conn, migration, batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """Estimate rows touched and duration without changing the database
+
+    Backfill estimates time one real batch (rolled back) and add the pauses
+    between batches. Schema-statement estimates are a rough upper bound
+    ("upper_bound": True), see INDEX_BUILD_FACTOR.
+    """
+    report = {"version": migration.version, "description": migration.description,
+              "rows": 0, "estimated_seconds": 0.0, "upper_bound": migration.backfill is None}
+
+    if migration.table is None or not _table_exists(conn, migration.table):
+        return report
+
+    if migration.backfill is not None:
+        last_rowid, rows_done = _load_checkpoint(conn, migration.version) \
+            if _table_exists(conn, 'migration_checkpoints') else (0, 0)
+        rows = conn.execute(f'SELECT COUNT(*) FROM {migration.table} WHERE rowid > ?',
+                            (last_rowid,)).fetchone()[0]
+
+        # Time one real batch, then throw the work away
+        sample = min(batch_size, ESTIMATE_SAMPLE_ROWS)
+        conn.execute('BEGIN')
+        try:
+            started = time.perf_counter()
+            _, seen = migration.backfill.run_batch(conn, last_rowid, sample)
+            elapsed = time.perf_counter() - started
+        finally:
+            conn.rollback()
+    else:
+        rows = conn.execute(f'SELECT COUNT(*) FROM {migration.table}').fetchone()[0]
+
+        started = time.perf_counter()
+        seen = len(conn.execute(f'SELECT * FROM {migration.table} LIMIT ?',
+                                (ESTIMATE_SAMPLE_ROWS,)).fetchall())
+        elapsed = (time.perf_counter() - started) * INDEX_BUILD_FACTOR
+
+    report["rows"] = rows
+    if seen:
+        estimate = elapsed / seen * rows
+        if migration.backfill is not None:
+            estimate += max(0, math.ceil(rows / batch_size) - 1) * pause
+        report["estimated_seconds"] = round(estimate, 3)
+    return report
+
+
+def migrate(conn, target=None, dry_run=False, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, log=None,
+            backfills=True):
+    """Bring the database up to `target` (default: latest); return one report per step
+
+    With backfills=False only schema statements are applied; registered
+    backfills are left for run_pending_backfills (or a later migrate call).
+    """
+    reports = []
+    pending = pending_migrations(conn, target)
+    for migration in pending:
+        if dry_run:
+            reports.append(estimate_migration(conn, migration, batch_size, pause))
+            continue
+
+        if log:
+            log(f"Applying migration {migration.version}: {migration.description}")
+        started = time.perf_counter()
+        if apply_schema(conn, migration):
+            reports.append({"version": migration.version, "description": migration.description,
+                            "seconds": round(time.perf_counter() - started, 3)})
+
+    for migration in pending_backfills(conn):
+        if dry_run:
+            # Backfills of migrations in `pending` were estimated above
+            if migration not in pending:
+                reports.append(estimate_migration(conn, migration, batch_size, pause))
+            continue
+        if not backfills:
+            continue
+
+        if log:
+            log(f"Running backfill {migration.version}: {migration.description}")
+        started = time.perf_counter()
+        run_backfill(conn, migration, batch_size=batch_size, pause=pause, log=log)
+        reports.append({"version": migration.version, "description": migration.description + " (backfill)",
+                        "seconds": round(time.perf_counter() - started, 3)})
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the cafe database")
+    parser.add_argument('--db', default='cafe_orders.db', help="database file (default: cafe_orders.db)")
+    parser.add_argument('--target', type=int, help="migrate up to this version (default: latest)")
+    parser.add_argument('--dry-run', action='store_true', help="report rows touched and estimated duration only")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="rows per backfill transaction")
+    parser.add_argument('--pause', type=float, default=0.05, help="seconds to sleep between backfill batches")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        print(f"Database {args.db} is at version {get_version(conn)} (latest: {LATEST_VERSION})")
+        reports = migrate(conn, target=args.target, dry_run=args.dry_run,
+                          batch_size=args.batch_size, pause=args.pause, log=print)
+    finally:
+        conn.close()
+
+    if not reports:
+        print("Nothing to do")
+    for report in reports:
+        if args.dry_run:
+            estimate = f"~{report['estimated_seconds']}s"
+            if report['upper_bound']:
+                estimate = f"up to {estimate} (rough upper bound)"
+            print(f"  {report['version']}: {report['description']} - ~{report['rows']} rows, {estimate}")
+        else:
+            print(f"  {report['version']}: {report['description']} - done in {report['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Request priorities used when shedding load. Higher numbers are shed last.
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_CRITICAL = 2
+
+
+class TokenBucket:
+    """A classic token bucket refilled continuously at `rate` tokens per second"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now, cost=1):
+        """Take `cost` tokens; return 0 on success or the seconds until enough tokens exist"""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets keyed by (client, route, kind) with separate read/write budgets"""
+
+    def __init__(self, budgets, max_buckets=10000, clock=time.monotonic):
+        # budgets: {"read": (tokens_per_second, burst), "write": (...)}
+        self.budgets = budgets
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client, route, kind):
+        """Return 0 if the request is allowed, otherwise the Retry-After delay in seconds"""
+        if kind not in self.budgets:
+            return 0
+
+        key = (client, route, kind)
+        now = self.clock()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, burst = self.budgets[kind]
+                bucket = TokenBucket(rate, burst, now)
+                self._buckets[key] = bucket
+                # Forget the least recently seen clients so memory stays bounded
+                while len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            return bucket.take(now)
+
+
+class LoadShedder:
+    """Admission control based on pending SQLite writes and recent request latency
+
+    Low priority requests (stats, analytics) are shed as soon as a threshold is
+    crossed; normal requests get some headroom and order creation is only
+    refused when the server is well past its limits.
+    """
+
+    PRIORITY_HEADROOM = {
+        PRIORITY_LOW: 1.0,
+        PRIORITY_NORMAL: 1.5,
+        PRIORITY_CRITICAL: 3.0,
+    }
+
+    def __init__(self, max_pending_writes=8, max_latency=0.5, retry_after=2, smoothing=0.2):
+        self.max_pending_writes = max_pending_writes
+        self.max_latency = max_latency
+        self.retry_after = retry_after
+        self.smoothing = smoothing
+        self.pending_writes = 0
+        self.latency = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track_write(self):
+        """Count a database write as pending for the duration of the block"""
+        with self._lock:
+            self.pending_writes += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.pending_writes -= 1
+
+    def record_latency(self, seconds):
+        """Fold a finished request's latency into an exponentially weighted average"""
+        with self._lock:
+            self.latency += self.smoothing * (seconds - self.latency)
+
+    def check(self, priority):
+        """Return 0 if a request of this priority is admitted, otherwise Retry-After seconds"""
+        headroom = self.PRIORITY_HEADROOM.get(priority, 1.0)
+        with self._lock:
+            overloaded = (self.pending_writes >= self.max_pending_writes * headroom or
+                          self.latency >= self.max_latency * headroom)
+        return self.retry_after if overloaded else 0
+
+
+def retry_after_header(seconds):
+    """Format a delay for the Retry-After header (whole seconds, at least 1)"""
+    return str(max(1, int(math.ceil(seconds))))
@@ -0,0 +1,255 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import migrations
+import wire_format
+from db import ConnectionPool
+from inventory import Inventory
+from rate_limit import LoadShedder
+from table_sessions import TableSessions
+
+DEFAULT_STORE_ID = 'main'
+DEFAULT_STORE_NAME = 'First Cup Coffee'
+STORE_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]{0,31}$')
+
+# Per-store stats rollups are recomputed at most this often
+STATS_TTL_SECONDS = 5.0
+
+# Sleep between batches of a background backfill so orders get the write lock
+BACKFILL_PAUSE_SECONDS = 0.05
+
+# Upper bound on shards queried at once by cross-store reports
+REPORT_WORKERS = 8
+
+# Range conditions on order_time so the idx_orders_order_time index is used
+TODAY_TOTALS_SQL = '''
+    SELECT COUNT(*), COALESCE(SUM(total_amount), 0)
+    FROM orders
+    WHERE order_time >= date('now') AND order_time < date('now', '+1 day')
+'''
+
+TODAY_STATUS_SQL = '''
+    SELECT status, COUNT(*)
+    FROM orders
+    WHERE order_time >= date('now') AND order_time < date('now', '+1 day')
+    GROUP BY status
+'''
+
+
+class Store:
+    """One café location: its own database file (shard), pool, caches and rollups"""
+
+    def __init__(self, store_id, name, db_path, menu_path, shedder_options=None):
+        self.id = store_id
+        self.name = name
+        self.db_path = db_path
+        self.menu_path = menu_path
+
+        # Connections are opened (and the schema checked) on first use
+        self.db_pool = ConnectionPool(db_path, initializer=self._init_db)
+        # Open tabs per table, cached in memory
+        self.table_tabs = TableSessions()
+        # Stock counters and availability, overlaid on the menu payload
+        self.inventory = Inventory()
+        # Each shard has its own write lock, so overload is tracked per store
+        self.load_shedder = LoadShedder(**(shedder_options or {}))
+
+        self._menu = None
+        self._stats = None
+        self._lock = threading.Lock()
+
+    def _init_db(self, conn):
+        """Bring the store's database up to the latest schema version
+
+        Runs once per store and process, on first database use, and only
+        applies schema statements, so it is quick and a no-op when PRAGMA
+        user_version is already current. Row backfills are left to a
+        background thread that pauses between batches; large databases can
+        also be migrated ahead of a deploy with `python migrations.py --db <file>`.
+        """
+        migrations.migrate(conn, backfills=False)
+        if migrations.pending_backfills(conn):
+            threading.Thread(target=migrations.run_pending_backfills, args=(self.db_path,),
+                             kwargs={"pause": BACKFILL_PAUSE_SECONDS},
+                             name=f'backfill-{self.id}', daemon=True).start()
+
+    def cache_key(self, name):
+        return f'{self.id}/{name}'
+
+    def menu(self):
+        """This store's menu, loaded on first use
+
+        Every store gets its own copy because availability is patched into
+        the item dicts in place.
+        """
+        if self._menu is None:
+            with self._lock:
+                if self._menu is None:
+                    with open(self.menu_path, encoding='utf-8') as f:
+                        self._menu = json.load(f)
+        return self._menu
+
+    def menu_changed(self, categories):
+        """Drop cached menu responses for categories whose availability changed"""
+        if categories:
+            wire_format.invalidate(self.cache_key('menu'))
+            for category in categories:
+                wire_format.invalidate(self.cache_key('menu/' + category))
+
+    def live_menu(self):
+        menu = self.menu()
+        self.menu_changed(self.inventory.sync(menu, self.db_pool.connection))
+        return menu
+
+    def find_menu_item(self, item_id):
+        for category, data in self.live_menu().items():
+            for item in data["items"]:
+                if item["id"] == item_id:
+                    return category, item
+        return None, None
+
+    def today_stats(self, max_age=STATS_TTL_SECONDS):
+        """Today's order count, revenue and status breakdown, cached for max_age seconds"""
+        cached = self._stats
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+
+        with self.db_pool.connection() as conn:
+            today_stats = conn.execute(TODAY_TOTALS_SQL).fetchone()
+            status_stats = dict(conn.execute(TODAY_STATUS_SQL).fetchall())
+
+        stats = {
+            "today": {
+                "total_orders": today_stats[0] or 0,
+                "total_revenue": today_stats[1] or 0
+            },
+            "status_breakdown": status_stats
+        }
+        self._stats = (time.monotonic(), stats)
+        return stats
+
+
+class StoreRegistry:
+    """Configured stores, created lazily on first request
+
+    Stores come from stores.json ({"<store_id>": {"name": ..., "db": ...,
+    "menu": ...}}, all keys optional). The default store always exists and
+    keeps using the original cafe_orders.db. Other stores default to
+    <store_dir>/<store_id>.db and the shared menu.json.
+
+    `served` limits which stores this process answers requests for, so stores
+    can be spread over several processes; reports still read every shard.
+    """
+
+    def __init__(self, config_path, default_db_path, default_menu_path, store_dir='stores',
+                 served=None, shedder_options=None):
+        self.default_db_path = default_db_path
+        self.default_menu_path = default_menu_path
+        self.store_dir = store_dir
+        self.served = set(served) if served else None
+        self.shedder_options = shedder_options
+        self.config = self._load_config(config_path)
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _load_config(self, config_path):
+        config = {}
+        if config_path and os.path.exists(config_path):
+            with open(config_path, encoding='utf-8') as f:
+                config = json.load(f)
+
+        for store_id in config:
+            if not STORE_ID_PATTERN.match(store_id):
+                raise ValueError(f"Invalid store id in {config_path}: {store_id!r}")
+
+        config.setdefault(DEFAULT_STORE_ID, {})
+        config[DEFAULT_STORE_ID].setdefault("name", DEFAULT_STORE_NAME)
+        config[DEFAULT_STORE_ID].setdefault("db", self.default_db_path)
+        return config
+
+    def _create(self, store_id):
+        options = self.config[store_id]
+        db_path = options.get("db") or os.path.join(self.store_dir, f'{store_id}.db')
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return Store(store_id, options.get("name", store_id), db_path,
+                     options.get("menu") or self.default_menu_path, self.shedder_options)
+
+    def _store(self, store_id):
+        store = self._stores.get(store_id)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(store_id)
+                if store is None:
+                    store = self._stores[store_id] = self._create(store_id)
+        return store
+
+    def get(self, store_id):
+        """The store for a request, or None if it is unknown or served by another process"""
+        if store_id not in self.config:
+            return None
+        if self.served is not None and store_id not in self.served:
+            return None
+        return self._store(store_id)
+
+    def all(self):
+        return [self._store(store_id) for store_id in sorted(self.config)]
+
+    def report(self, priority=None):
+        """Today's stats from every shard, queried in parallel and merged
+
+        With a priority, shards whose load shedder rejects it are skipped
+        rather than queried; they are listed with "busy": True and a
+        "retry_after", and the totals cover the other shards only.
+        """
+        stores = []
+        skipped = {}
+        for store in self.all():
+            retry_after = store.load_shedder.check(priority) if priority is not None else 0
+            if retry_after:
+                skipped[store.id] = {"store_id": store.id, "name": store.name, "error": "Store is busy",
+                                     "busy": True, "retry_after": retry_after}
+            else:
+                stores.append(store)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS,
+                                                    thread_name_prefix='store-report')
+        queried = {result["store_id"]: result for result in self._executor.map(_store_stats, stores)}
+        results = [skipped.get(store_id) or queried[store_id] for store_id in sorted(self.config)]
+
+        total_orders = 0
+        total_revenue = 0
+        status_breakdown = {}
+        for result in results:
+            if "error" in result:
+                continue
+            total_orders += result["today"]["total_orders"]
+            total_revenue += result["today"]["total_revenue"]
+            for status, count in result["status_breakdown"].items():
+                status_breakdown[status] = status_breakdown.get(status, 0) + count
+
+        return {
+            "today": {
+                "total_orders": total_orders,
+                "total_revenue": total_revenue
+            },
+            "status_breakdown": status_breakdown,
+            "stores": results
+        }
+
+
+def _store_stats(store):
+    # One unreachable shard should not fail the whole report
+    try:
+        stats = store.today_stats()
+    except Exception as e:
+        return {"store_id": store.id, "name": store.name, "error": str(e)}
+    return dict(stats, store_id=store.id, name=store.name)
@@ -0,0 +1,149 @@
+import threading
+import time
+import uuid
+
+MIN_TABLE_NUMBER = 1
+MAX_TABLE_NUMBER = 50
+
+# How long a cached tab may be served before it is re-read from the database.
+# Writes made by this process update the cache immediately; the TTL only
+# bounds staleness from other worker processes.
+CACHE_TTL_SECONDS = 2.0
+
+SESSION_COLUMNS = 'id, table_number, status, opened_at, closed_at, order_count, item_count, total_amount'
+
+SELECT_OPEN_SESSION_SQL = f'''
+    SELECT {SESSION_COLUMNS}
+    FROM table_sessions
+    WHERE table_number = ? AND status = 'open'
+'''
+
+SELECT_OPEN_SESSIONS_SQL = f'''
+    SELECT {SESSION_COLUMNS}
+    FROM table_sessions
+    WHERE status = 'open'
+    ORDER BY table_number
+'''
+
+INSERT_SESSION_SQL = 'INSERT INTO table_sessions (id, table_number) VALUES (?, ?)'
+
+ADD_TO_SESSION_SQL = '''
+    UPDATE table_sessions
+    SET order_count = order_count + ?, item_count = item_count + ?, total_amount = total_amount + ?
+    WHERE id = ? AND status = 'open'
+'''
+
+CLOSE_SESSION_SQL = '''
+    UPDATE table_sessions
+    SET status = 'closed', closed_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+SELECT_SESSION_SQL = f'SELECT {SESSION_COLUMNS} FROM table_sessions WHERE id = ?'
+
+
+def valid_table_number(table_number):
+    return (isinstance(table_number, int) and not isinstance(table_number, bool) and
+            MIN_TABLE_NUMBER <= table_number <= MAX_TABLE_NUMBER)
+
+
+def row_to_tab(row):
+    return {
+        "session_id": row[0],
+        "table_number": row[1],
+        "status": row[2],
+        "opened_at": row[3],
+        "closed_at": row[4],
+        "order_count": row[5],
+        "item_count": row[6],
+        "total_amount": row[7]
+    }
+
+
+class TableSessions:
+    """Open tabs per table with running totals
+
+    The SQL helpers take a connection and expect to run inside the caller's
+    transaction (see db.transaction). They return the new tab state; callers
+    pass it to remember() once the transaction has committed, so the cache
+    never holds uncommitted data.
+    """
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._tabs = {}
+        self._lock = threading.Lock()
+
+    # Database operations (run inside a transaction)
+
+    def open_tab(self, conn, table_number):
+        """Return the open tab for a table, creating one if needed"""
+        row = conn.execute(SELECT_OPEN_SESSION_SQL, (table_number,)).fetchone()
+        if row is None:
+            session_id = str(uuid.uuid4())[:8].upper()
+            conn.execute(INSERT_SESSION_SQL, (session_id, table_number))
+            row = conn.execute(SELECT_SESSION_SQL, (session_id,)).fetchone()
+        return row_to_tab(row)
+
+    def add_order(self, conn, table_number, total_amount, item_count):
+        """Add an order to the table's open tab (opening one if needed)"""
+        tab = self.open_tab(conn, table_number)
+        return self.adjust(conn, tab["session_id"], 1, item_count, total_amount)
+
+    def adjust(self, conn, session_id, orders, items, amount):
+        """Apply a delta to an open tab's running totals; None if the tab is closed"""
+        cursor = conn.execute(ADD_TO_SESSION_SQL, (orders, items, amount, session_id))
+        if cursor.rowcount == 0:
+            return None
+        return row_to_tab(conn.execute(SELECT_SESSION_SQL, (session_id,)).fetchone())
+
+    def close_tab(self, conn, table_number):
+        """Close the table's open tab; return the final tab or None if none was open"""
+        row = conn.execute(SELECT_OPEN_SESSION_SQL, (table_number,)).fetchone()
+        if row is None:
+            return None
+        conn.execute(CLOSE_SESSION_SQL, (row[0],))
+        return row_to_tab(conn.execute(SELECT_SESSION_SQL, (row[0],)).fetchone())
+
+    # Cache
+
+    def remember(self, tab):
+        """Record committed tab state; closed tabs are dropped from the cache"""
+        with self._lock:
+            self._tabs[tab["table_number"]] = (self.clock(), tab if tab["status"] == 'open' else None)
+
+    def get_tab(self, conn_factory, table_number):
+        """Open tab for a table, from the cache when fresh; None if the table has no tab"""
+        with self._lock:
+            cached = self._tabs.get(table_number)
+        if cached is not None and self.clock() - cached[0] < self.ttl:
+            return cached[1]
+
+        started = self.clock()
+        with conn_factory() as conn:
+            row = conn.execute(SELECT_OPEN_SESSION_SQL, (table_number,)).fetchone()
+        tab = row_to_tab(row) if row else None
+        with self._lock:
+            self._store(table_number, started, tab)
+        return tab
+
+    def overview(self, conn_factory):
+        """All open tabs, ordered by table number"""
+        started = self.clock()
+        with conn_factory() as conn:
+            tabs = [row_to_tab(row) for row in conn.execute(SELECT_OPEN_SESSIONS_SQL)]
+
+        # The overview is a full snapshot, so it refreshes every table's cache entry
+        snapshot = dict.fromkeys(range(MIN_TABLE_NUMBER, MAX_TABLE_NUMBER + 1))
+        snapshot.update((tab["table_number"], tab) for tab in tabs)
+        with self._lock:
+            for table_number, tab in snapshot.items():
+                self._store(table_number, started, tab)
+        return tabs
+
+    def _store(self, table_number, read_at, tab):
+        # A tab remembered after the read started is newer than what was read
+        cached = self._tabs.get(table_number)
+        if cached is None or cached[0] < read_at:
+            self._tabs[table_number] = (read_at, tab)
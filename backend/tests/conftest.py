@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other as top-level modules (python app.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STORES_CONFIG = {"north": {"name": "First Cup North"}}
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """The Flask app with its stores and rate limits backed by a temporary directory"""
+    import app
+    import wire_format
+    from rate_limit import RateLimiter
+    from stores import StoreRegistry
+
+    config_path = tmp_path / 'stores.json'
+    config_path.write_text(json.dumps(STORES_CONFIG), encoding='utf-8')
+    registry = StoreRegistry(str(config_path),
+                             default_db_path=str(tmp_path / 'cafe_orders.db'),
+                             default_menu_path=os.path.join(app.BASE_DIR, 'menu.json'),
+                             store_dir=str(tmp_path / 'stores'),
+                             shedder_options={"max_pending_writes": app.MAX_PENDING_WRITES,
+                                              "max_latency": app.MAX_LATENCY_SECONDS})
+    monkeypatch.setattr(app, 'stores', registry)
+    monkeypatch.setattr(app, 'rate_limiter', RateLimiter(app.RATE_LIMITS))
+    # Cached bodies are keyed by store id, which every test reuses
+    wire_format.invalidate()
+    yield app
+    wire_format.invalidate()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
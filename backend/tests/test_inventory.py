@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+
+import pytest
+
+import migrations
+from db import transaction
+from inventory import Inventory, OutOfStock
+
+STOCK = 10
+BUYERS = 25
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'cafe_orders.db')
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn)
+    conn.execute("INSERT INTO menu_items (id, name, price, category, stock) VALUES ('latte', 'Latte', 150, 'coffee', ?)",
+                 (STOCK,))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_concurrent_reserve_does_not_oversell(db_path):
+    inventory = Inventory()
+    results = []
+    start = threading.Barrier(BUYERS)
+
+    def buy():
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        try:
+            start.wait()
+            with transaction(conn):
+                inventory.reserve(conn, [{"id": "latte", "quantity": 1}])
+            results.append(True)
+        except OutOfStock:
+            results.append(False)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=buy) for _ in range(BUYERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    conn = sqlite3.connect(db_path)
+    stock = conn.execute("SELECT stock FROM menu_items WHERE id = 'latte'").fetchone()[0]
+    conn.close()
+    assert results.count(True) == STOCK
+    assert results.count(False) == BUYERS - STOCK
+    assert stock == 0
+
+
+def test_menu_only_changes_when_availability_flips():
+    inventory = Inventory()
+    menu = {"coffee": {"items": [{"id": "latte"}]}}
+    inventory.sync(menu, lambda: FakeConnection([]))
+
+    assert inventory.record({"latte": (True, 2)}) == set()
+    assert inventory.record({"latte": (True, 0)}) == {"coffee"}
+    assert menu["coffee"]["items"][0] == {"id": "latte", "available": False}
+    assert inventory.snapshot() == [{"id": "latte", "available": False, "stock": 0}]
+
+
+def test_sync_keeps_changes_recorded_during_the_read():
+    inventory = Inventory(refresh_interval=0)
+    menu = {"coffee": {"items": [{"id": "latte"}]}}
+
+    def read_with_concurrent_order():
+        inventory.record({"latte": (True, 0)})
+        return FakeConnection([("latte", 1, 1)])
+
+    inventory.sync(menu, read_with_concurrent_order)
+
+    assert menu["coffee"]["items"][0]["available"] is False
+    assert inventory.snapshot() == [{"id": "latte", "available": False, "stock": 0}]
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=()):
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+
+def order_latte(client, quantity):
+    return client.post('/api/orders', json={"table_number": 4,
+                                            "items": [{"id": "latte", "price": 150, "quantity": quantity}]})
+
+
+def latte_available(client):
+    items = client.get('/api/menu/coffee').get_json()["items"]
+    return next(item["available"] for item in items if item["id"] == "latte")
+
+
+def test_cancelling_an_order_gives_its_stock_back(client):
+    client.put('/api/inventory/latte', json={"stock": 2})
+    order_id = order_latte(client, 2).get_json()["order_id"]
+    assert client.get('/api/inventory').get_json() == [{"id": "latte", "available": False, "stock": 0}]
+    assert latte_available(client) is False
+
+    client.put(f'/api/orders/{order_id}/status', json={"status": "cancelled"})
+
+    assert client.get('/api/inventory').get_json() == [{"id": "latte", "available": True, "stock": 2}]
+    assert latte_available(client) is True
+    assert client.get('/api/tables/4/tab').get_json()["total_amount"] == 0
+
+
+def test_uncancelling_an_order_takes_its_stock_again(client):
+    client.put('/api/inventory/latte', json={"stock": 3})
+    order_id = order_latte(client, 2).get_json()["order_id"]
+    client.put(f'/api/orders/{order_id}/status', json={"status": "cancelled"})
+    order_latte(client, 2)
+
+    # Only one latte is left, so the order cannot come back
+    response = client.put(f'/api/orders/{order_id}/status', json={"status": "pending"})
+    assert response.status_code == 409
+    assert client.get(f'/api/orders/{order_id}').get_json()["status"] == "cancelled"
+
+    client.put('/api/inventory/latte', json={"stock": 5})
+    response = client.put(f'/api/orders/{order_id}/status', json={"status": "pending"})
+    assert response.status_code == 200
+    assert client.get('/api/inventory').get_json() == [{"id": "latte", "available": True, "stock": 3}]
+    assert client.get('/api/tables/4/tab').get_json()["total_amount"] == 600
@@ -0,0 +1,106 @@
+import json
+import sqlite3
+
+import pytest
+
+import migrations
+from migrations import LATEST_VERSION, MIGRATIONS
+
+ORDER_COUNT = 25
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'cafe_orders.db')
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def add_orders(conn, count=ORDER_COUNT):
+    items = json.dumps([{"id": "latte", "quantity": 1}], indent=2)
+    conn.executemany('INSERT INTO orders (id, items) VALUES (?, ?)',
+                     [(f'ORD{i:04d}', items) for i in range(count)])
+    conn.commit()
+
+
+def compacted(conn):
+    return conn.execute("SELECT COUNT(*) FROM orders WHERE items NOT LIKE '% %'").fetchone()[0]
+
+
+def test_migrate_from_scratch(conn):
+    migrations.migrate(conn)
+
+    assert migrations.get_version(conn) == LATEST_VERSION
+    assert migrations.pending_backfills(conn) == []
+
+
+def test_schema_only_leaves_backfill_pending(conn):
+    migrations.migrate(conn, target=2)
+    add_orders(conn)
+
+    migrations.migrate(conn, backfills=False)
+
+    assert migrations.get_version(conn) == LATEST_VERSION
+    assert [m.version for m in migrations.pending_backfills(conn)] == [3]
+    assert compacted(conn) == 0
+
+
+def test_stale_plan_does_not_move_version_backwards(conn, db_path):
+    planned = migrations.pending_migrations(conn)
+
+    # Another worker migrates the database after our plan was made
+    other = sqlite3.connect(db_path)
+    migrations.migrate(other)
+    other.close()
+
+    assert [migrations.apply_schema(conn, m) for m in planned] == [False] * len(planned)
+    assert migrations.get_version(conn) == LATEST_VERSION
+
+
+def test_interrupted_backfill_resumes(conn, db_path, monkeypatch):
+    migrations.migrate(conn, target=2)
+    add_orders(conn)
+    migrations.migrate(conn, backfills=False)
+
+    backfill = MIGRATIONS[2].backfill
+    run_batch = backfill.run_batch
+    calls = []
+
+    def interrupted(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return run_batch(*args)
+
+    monkeypatch.setattr(backfill, 'run_batch', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        migrations.run_backfill(conn, MIGRATIONS[2], batch_size=10)
+    monkeypatch.undo()
+
+    # The failed batch was rolled back; the two committed ones are kept
+    assert compacted(conn) == 20
+    assert migrations.pending_backfills(conn) == [MIGRATIONS[2]]
+
+    migrations.run_pending_backfills(db_path, batch_size=10)
+
+    assert compacted(conn) == ORDER_COUNT
+    assert migrations.pending_backfills(conn) == []
+    assert conn.execute('SELECT rows_done FROM migration_checkpoints WHERE version = 3').fetchone() == (ORDER_COUNT,)
+
+
+def test_dry_run_changes_nothing(conn):
+    migrations.migrate(conn, target=2)
+    add_orders(conn)
+
+    reports = migrations.migrate(conn, dry_run=True)
+
+    assert [r["version"] for r in reports] == [3, 4, 5]
+    assert reports[0]["rows"] == ORDER_COUNT and not reports[0]["upper_bound"]
+    assert reports[1]["rows"] == ORDER_COUNT and reports[1]["upper_bound"]
+    assert migrations.get_version(conn) == 2
+    assert compacted(conn) == 0
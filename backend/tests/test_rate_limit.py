@@ -0,0 +1,115 @@
+from contextlib import ExitStack
+
+from rate_limit import (LoadShedder, RateLimiter, TokenBucket, retry_after_header,
+                        PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_CRITICAL)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_bursts_then_refills():
+    bucket = TokenBucket(rate=2, capacity=3, now=0.0)
+
+    assert [bucket.take(0.0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(0.0) == 0.5
+
+    assert bucket.take(0.5) == 0
+    assert bucket.take(0.5) == 0.5
+
+
+def test_token_bucket_never_exceeds_capacity():
+    bucket = TokenBucket(rate=10, capacity=2, now=0.0)
+
+    assert bucket.take(60.0, cost=2) == 0
+    assert bucket.take(60.0) == 0.1
+
+
+def test_rate_limiter_separates_clients_routes_and_kinds():
+    clock = FakeClock()
+    limiter = RateLimiter({"read": (1, 2), "write": (1, 1)}, clock=clock)
+
+    assert limiter.check('1.1.1.1', 'orders', 'read') == 0
+    assert limiter.check('1.1.1.1', 'orders', 'read') == 0
+    assert limiter.check('1.1.1.1', 'orders', 'read') == 1
+
+    assert limiter.check('2.2.2.2', 'orders', 'read') == 0
+    assert limiter.check('1.1.1.1', 'menu', 'read') == 0
+    assert limiter.check('1.1.1.1', 'orders', 'write') == 0
+    assert limiter.check('1.1.1.1', 'orders', 'write') == 1
+    # Kinds without a budget are not limited
+    assert limiter.check('1.1.1.1', 'orders', 'admin') == 0
+
+    clock.now += 1
+    assert limiter.check('1.1.1.1', 'orders', 'read') == 0
+
+
+def test_rate_limiter_evicts_least_recently_seen_clients():
+    clock = FakeClock()
+    limiter = RateLimiter({"write": (1, 1)}, max_buckets=2, clock=clock)
+
+    limiter.check('a', 'orders', 'write')
+    limiter.check('b', 'orders', 'write')
+    # Seeing 'a' again makes 'b' the oldest
+    assert limiter.check('a', 'orders', 'write') == 1
+    limiter.check('c', 'orders', 'write')
+
+    assert len(limiter._buckets) == 2
+    # 'a' kept its empty bucket; 'b' was forgotten and starts over with a full one
+    assert limiter.check('a', 'orders', 'write') == 1
+    assert limiter.check('b', 'orders', 'write') == 0
+
+
+def test_load_shedder_sheds_low_priority_first():
+    shedder = LoadShedder(max_pending_writes=4, max_latency=1.0, retry_after=3)
+
+    def admitted():
+        return [shedder.check(p) == 0 for p in (PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_CRITICAL)]
+
+    def hold_writes(count):
+        for _ in range(count):
+            writes.enter_context(shedder.track_write())
+
+    with ExitStack() as writes:
+        hold_writes(3)
+        assert admitted() == [True, True, True]
+        hold_writes(1)
+        assert admitted() == [False, True, True]
+        hold_writes(2)
+        assert admitted() == [False, False, True]
+        hold_writes(6)
+        assert admitted() == [False, False, False]
+        assert shedder.check(PRIORITY_CRITICAL) == 3
+
+    assert admitted() == [True, True, True]
+
+
+def test_load_shedder_releases_writes():
+    shedder = LoadShedder(max_pending_writes=1)
+
+    with shedder.track_write():
+        assert shedder.check(PRIORITY_LOW)
+    assert shedder.pending_writes == 0
+    assert shedder.check(PRIORITY_LOW) == 0
+
+
+def test_load_shedder_uses_smoothed_latency():
+    shedder = LoadShedder(max_latency=1.0, smoothing=0.5)
+
+    shedder.record_latency(4.0)
+    assert shedder.latency == 2.0
+    assert shedder.check(PRIORITY_NORMAL) and shedder.check(PRIORITY_CRITICAL) == 0
+
+    shedder.record_latency(0.0)
+    assert shedder.latency == 1.0
+    assert shedder.check(PRIORITY_LOW) and shedder.check(PRIORITY_NORMAL) == 0
+
+
+def test_retry_after_header_rounds_up_to_whole_seconds():
+    assert retry_after_header(0.01) == '1'
+    assert retry_after_header(1.2) == '2'
+    assert retry_after_header(3) == '3'
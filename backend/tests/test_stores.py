@@ -0,0 +1,89 @@
+from contextlib import ExitStack
+
+from app import RATE_LIMITS
+from stores import StoreRegistry
+
+READ_BURST = RATE_LIMITS["read"][1]
+
+
+def test_default_store_has_one_budget_under_both_prefixes(client):
+    for _ in range(READ_BURST):
+        assert client.get('/api/orders').status_code == 200
+
+    assert client.get('/api/stores/main/orders').status_code == 429
+
+
+def test_each_store_has_its_own_budget(client):
+    for _ in range(READ_BURST):
+        assert client.get('/api/stores/main/orders').status_code == 200
+
+    assert client.get('/api/stores/main/orders').status_code == 429
+    assert client.get('/api/stores/north/orders').status_code == 200
+
+
+def place_order(client, prefix, price, quantity=1):
+    response = client.post(f'{prefix}/orders', json={"table_number": 1,
+                                                     "items": [{"id": "espresso", "price": price, "quantity": quantity}]})
+    assert response.status_code == 200
+
+
+def overload(store):
+    # Hold the shard's pending-write count at its limit
+    stack = ExitStack()
+    for _ in range(store.load_shedder.max_pending_writes):
+        stack.enter_context(store.load_shedder.track_write())
+    return stack
+
+
+def test_report_merges_every_shard(client):
+    place_order(client, '/api', 100)
+    place_order(client, '/api/stores/north', 150, quantity=2)
+
+    report = client.get('/api/reports/stores').get_json()
+
+    assert report["today"] == {"total_orders": 2, "total_revenue": 400}
+    assert report["status_breakdown"] == {"pending": 2}
+    assert report["partial"] is False
+    assert [(s["store_id"], s["today"]["total_revenue"]) for s in report["stores"]] == [("main", 100), ("north", 300)]
+
+
+def test_report_skips_busy_shards(client, app_module):
+    place_order(client, '/api', 100)
+    place_order(client, '/api/stores/north', 150)
+
+    with overload(app_module.stores.get('north')):
+        report = client.get('/api/reports/stores').get_json()
+
+    assert report["partial"] is True
+    assert report["today"] == {"total_orders": 1, "total_revenue": 100}
+    main, north = report["stores"]
+    assert main["store_id"] == "main" and "error" not in main
+    assert north == {"store_id": "north", "name": "First Cup North", "error": "Store is busy",
+                     "busy": True, "retry_after": 2}
+
+
+def test_report_is_rejected_when_every_shard_is_busy(client, app_module):
+    with overload(app_module.stores.get('main')), overload(app_module.stores.get('north')):
+        response = client.get('/api/reports/stores')
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '2'
+
+
+def test_registry_reads_stores_json(app_module):
+    registry = app_module.stores
+
+    assert [store.id for store in registry.all()] == ["main", "north"]
+    assert registry.get('north').name == "First Cup North"
+    assert registry.get('south') is None
+
+
+def test_registry_only_serves_listed_stores(app_module, tmp_path):
+    registry = StoreRegistry(str(tmp_path / 'stores.json'), str(tmp_path / 'cafe_orders.db'),
+                             app_module.stores.default_menu_path, store_dir=str(tmp_path / 'stores'),
+                             served=['north'])
+
+    assert registry.get('main') is None
+    assert registry.get('north').id == "north"
+    # Reports still cover every shard
+    assert [store.id for store in registry.all()] == ["main", "north"]
@@ -0,0 +1,128 @@
+import sqlite3
+from contextlib import contextmanager, nullcontext
+
+import pytest
+
+import migrations
+from db import transaction
+from table_sessions import TableSessions
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'cafe_orders.db'))
+    migrations.migrate(conn)
+    yield conn
+    conn.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def order(client, table_number, price, quantity=1):
+    response = client.post('/api/orders', json={"table_number": table_number,
+                                                "items": [{"id": "espresso", "price": price, "quantity": quantity}]})
+    return response.get_json()
+
+
+def test_tab_accounting(client):
+    first = order(client, 7, 100, quantity=2)
+    second = order(client, 7, 150)
+    assert first["tab_total"] == 200 and second["tab_total"] == 350
+
+    client.put(f'/api/orders/{first["order_id"]}/status', json={"status": "cancelled"})
+    tab = client.get('/api/tables/7/tab').get_json()
+    assert (tab["order_count"], tab["item_count"], tab["total_amount"]) == (1, 1, 150)
+
+    closed = client.post('/api/tables/7/tab/close').get_json()["tab"]
+    assert closed["status"] == "closed" and closed["total_amount"] == 150
+    assert client.get('/api/tables/7/tab').status_code == 404
+    assert client.get('/api/tables').get_json()["occupied"] == 0
+
+    # The next order starts a fresh tab
+    order(client, 7, 120)
+    tab = client.get('/api/tables/7/tab').get_json()
+    assert tab["session_id"] != closed["session_id"]
+    assert (tab["order_count"], tab["total_amount"]) == (1, 120)
+
+
+def test_invalid_table_number(client):
+    assert client.get('/api/tables/0/tab').status_code == 400
+    assert client.post('/api/orders', json={"table_number": 51, "items": []}).status_code == 400
+
+
+def test_one_open_tab_per_table(conn):
+    sessions = TableSessions()
+    with transaction(conn):
+        tab = sessions.open_tab(conn, 3)
+    with transaction(conn):
+        assert sessions.open_tab(conn, 3)["session_id"] == tab["session_id"]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with transaction(conn):
+            conn.execute("INSERT INTO table_sessions (id, table_number) VALUES ('SECOND', 3)")
+
+    # Closed tabs do not count
+    with transaction(conn):
+        sessions.close_tab(conn, 3)
+        conn.execute("INSERT INTO table_sessions (id, table_number) VALUES ('SECOND', 3)")
+
+
+def add_order(conn, sessions, table_number, amount):
+    with transaction(conn):
+        return sessions.add_order(conn, table_number, amount, 1)
+
+
+def concurrent_remember(conn, clock, sessions, tab):
+    @contextmanager
+    def connection():
+        # Another request commits and remembers a tab while this read runs
+        clock.now += 0.1
+        sessions.remember(tab)
+        yield conn
+    return connection
+
+
+@contextmanager
+def no_database():
+    pytest.fail("served from the cache")
+    yield
+
+
+def test_overview_keeps_tabs_remembered_during_the_read(conn):
+    clock = FakeClock()
+    sessions = TableSessions(clock=clock)
+    add_order(conn, sessions, 1, 100)
+    newer = dict(add_order(conn, sessions, 2, 100), total_amount=999)
+
+    tabs = sessions.overview(concurrent_remember(conn, clock, sessions, newer))
+
+    assert [(tab["table_number"], tab["total_amount"]) for tab in tabs] == [(1, 100), (2, 100)]
+    assert sessions.get_tab(no_database, 1)["total_amount"] == 100
+    assert sessions.get_tab(no_database, 2)["total_amount"] == 999
+    assert sessions.get_tab(no_database, 3) is None
+
+
+def test_get_tab_keeps_tab_remembered_during_the_read(conn):
+    clock = FakeClock()
+    sessions = TableSessions(clock=clock)
+    newer = dict(add_order(conn, sessions, 5, 100), total_amount=999)
+
+    assert sessions.get_tab(concurrent_remember(conn, clock, sessions, newer), 5)["total_amount"] == 100
+    assert sessions.get_tab(no_database, 5)["total_amount"] == 999
+
+
+def test_stale_cache_entries_are_re_read(conn):
+    clock = FakeClock()
+    sessions = TableSessions(clock=clock)
+    add_order(conn, sessions, 6, 100)
+    sessions.remember({"table_number": 6, "status": "closed"})
+    assert sessions.get_tab(no_database, 6) is None
+
+    clock.now += sessions.ttl
+    assert sessions.get_tab(lambda: nullcontext(conn), 6)["total_amount"] == 100
@@ -0,0 +1,104 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+import wire_format
+from wire_format import COMPACT_JSON_MIMETYPE, COMPRESS_MIN_SIZE, JSON_MIMETYPE, MSGPACK_MIMETYPE
+
+
+@pytest.fixture
+def request_context():
+    app = Flask(__name__)
+
+    def context(**headers):
+        return app.test_request_context('/', headers=headers)
+    yield context
+    wire_format.invalidate()
+
+
+def test_plain_json_by_default(client):
+    response = client.get('/api/menu', headers={"Accept": "*/*"})
+
+    assert response.mimetype == JSON_MIMETYPE
+    assert "coffee" in response.get_json()
+    assert 'Accept' in response.vary
+
+
+def test_compact_json_when_asked_for(client):
+    response = client.get('/api/menu', headers={"Accept": COMPACT_JSON_MIMETYPE})
+
+    assert response.mimetype == COMPACT_JSON_MIMETYPE
+    item = json.loads(response.data)["coffee"]["l"][0]
+    assert item["i"] == "americano" and item["n"] == "Americano"
+
+
+@pytest.mark.parametrize("accept", [
+    "*/*",
+    f"{JSON_MIMETYPE}, {COMPACT_JSON_MIMETYPE}",
+    f"{COMPACT_JSON_MIMETYPE};q=0.5, {JSON_MIMETYPE}",
+    f"{COMPACT_JSON_MIMETYPE};q=0.5, */*",
+])
+def test_json_wins_unless_something_else_is_preferred(request_context, accept):
+    with request_context(Accept=accept):
+        assert wire_format.negotiate_format() == JSON_MIMETYPE
+
+
+def test_msgpack_when_asked_for(request_context):
+    msgpack = pytest.importorskip('msgpack')
+    with request_context(Accept='application/x-msgpack'):
+        assert wire_format.negotiate_format() == MSGPACK_MIMETYPE
+        body = wire_format.encode_body({"id": "latte"}, MSGPACK_MIMETYPE)
+    assert msgpack.unpackb(body) == {"id": "latte"}
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get('/api/wire/keys', headers={"Accept-Encoding": "gzip"})
+
+    assert len(response.data) < COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == wire_format.COMPACT_KEYS
+
+
+def test_large_bodies_are_gzipped(client):
+    plain = client.get('/api/menu').data
+    response = client.get('/api/menu', headers={"Accept-Encoding": "gzip"})
+
+    assert len(plain) >= COMPRESS_MIN_SIZE
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert gzip.decompress(response.data) == plain
+    assert len(response.data) < len(plain)
+
+
+def test_cached_body_is_reused_until_invalidated(request_context):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b'{"version":%d}' % len(builds)
+
+    with request_context():
+        first = wire_format._cached_response('test/cached', JSON_MIMETYPE, build)
+        second = wire_format._cached_response('test/cached', JSON_MIMETYPE, build)
+        wire_format.invalidate('test/cached')
+        third = wire_format._cached_response('test/cached', JSON_MIMETYPE, build)
+
+    assert (first.data, second.data, third.data) == (b'{"version":1}', b'{"version":1}', b'{"version":2}')
+
+
+def test_body_built_during_invalidation_is_not_cached(request_context):
+    versions = iter([b'"stale"', b'"fresh"'])
+
+    def build():
+        # The data changes while this body is being built
+        wire_format.invalidate('test/racy')
+        return next(versions)
+
+    with request_context():
+        first = wire_format._cached_response('test/racy', JSON_MIMETYPE, build)
+        second = wire_format._cached_response('test/racy', JSON_MIMETYPE, lambda: next(versions))
+
+    assert first.data == b'"stale"'
+    assert second.data == b'"fresh"'
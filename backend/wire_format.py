@@ -0,0 +1,185 @@
+import gzip
+import importlib
+import json
+import threading
+from functools import lru_cache
+
+from flask import Response, jsonify, request
+
+JSON_MIMETYPE = 'application/json'
+COMPACT_JSON_MIMETYPE = 'application/vnd.firstcup.compact+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = {JSON_MIMETYPE, COMPACT_JSON_MIMETYPE, MSGPACK_MIMETYPE, 'text/html'}
+
+# Short keys used by the compact JSON representation. Keys not listed are sent unchanged.
+COMPACT_KEYS = {
+    "id": "i",
+    "customer_name": "c",
+    "table_number": "t",
+    "items": "l",
+    "total_amount": "a",
+    "status": "s",
+    "order_time": "o",
+    "estimated_time": "e",
+    "name": "n",
+    "description": "d",
+    "price": "p",
+    "quantity": "q",
+    "image": "m",
+    "title": "h",
+    "icon": "g"
+}
+
+_cache = {}
+_cache_lock = threading.Lock()
+# Bumped by invalidate() so a body built from data that changed meanwhile is not cached
+_generation = 0
+
+
+@lru_cache(maxsize=None)
+def optional_module(name):
+    """Import an optional dependency on first use; None if it is not installed"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def shorten_keys(value):
+    """Recursively rename known keys to their compact form"""
+    if isinstance(value, dict):
+        return {COMPACT_KEYS.get(k, k): shorten_keys(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [shorten_keys(v) for v in value]
+    return value
+
+
+def negotiate_format():
+    """Pick the response representation from the Accept header (JSON unless asked otherwise)"""
+    offers = [JSON_MIMETYPE, COMPACT_JSON_MIMETYPE]
+    if optional_module('msgpack') is not None:
+        offers += [MSGPACK_MIMETYPE, 'application/x-msgpack']
+
+    best = request.accept_mimetypes.best_match(offers, default=JSON_MIMETYPE)
+    # Only switch away from plain JSON when the client explicitly asked for it
+    if best != JSON_MIMETYPE and request.accept_mimetypes[best] <= request.accept_mimetypes[JSON_MIMETYPE]:
+        best = JSON_MIMETYPE
+    if best == 'application/x-msgpack':
+        best = MSGPACK_MIMETYPE
+    return best
+
+
+def negotiate_encoding():
+    """Pick a content coding supported by both sides, preferring brotli"""
+    accepted = request.accept_encodings
+    if accepted['br'] and optional_module('brotli') is not None:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def encode_body(payload, mimetype):
+    if mimetype == MSGPACK_MIMETYPE:
+        return optional_module('msgpack').packb(payload, use_bin_type=True)
+    if mimetype == COMPACT_JSON_MIMETYPE:
+        payload = shorten_keys(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return optional_module('brotli').compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def render(payload, cache_key=None):
+    """Serialize a payload in the negotiated format
+
+    Plain JSON without a cache key goes through jsonify as before. When a
+    cache_key is given (static payloads such as the menu), the serialized and
+    compressed bytes are kept per format and encoding until invalidate() is
+    called.
+    """
+    mimetype = negotiate_format()
+    if mimetype == JSON_MIMETYPE and cache_key is None:
+        response = jsonify(payload)
+        response.vary.add('Accept')
+        return response
+
+    if cache_key is not None:
+        return _cached_response(cache_key, mimetype, lambda: encode_body(payload, mimetype), vary_accept=True)
+
+    response = Response(encode_body(payload, mimetype), mimetype=mimetype)
+    response.vary.add('Accept')
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def render_static(body, mimetype, cache_key):
+    """Serve prebuilt bytes (e.g. the docs page), compressing them only once per encoding"""
+    return _cached_response(cache_key, mimetype, lambda: body)
+
+
+def _cached_response(cache_key, mimetype, build, vary_accept=False):
+    key = (cache_key, mimetype, negotiate_encoding())
+    with _cache_lock:
+        cached = _cache.get(key)
+        generation = _generation
+    if cached is None:
+        body, encoding = build(), None
+        if key[2] is not None and len(body) >= COMPRESS_MIN_SIZE:
+            body, encoding = compress_body(body, key[2]), key[2]
+        cached = (body, encoding)
+        with _cache_lock:
+            if generation == _generation:
+                _cache[key] = cached
+
+    body, encoding = cached
+    response = Response(body, mimetype=mimetype)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    if vary_accept:
+        response.vary.add('Accept')
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def invalidate(cache_key=None):
+    """Drop cached bodies for one cache key, or all of them"""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        if cache_key is None:
+            _cache.clear()
+            return
+        for key in [k for k in _cache if k[0] == cache_key]:
+            del _cache[key]
+
+
+def compress_response(response):
+    """after_request hook: compress large uncompressed responses"""
+    if (response.status_code < 200 or response.status_code >= 300 or
+            response.direct_passthrough or
+            'Content-Encoding' in response.headers or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -92,7 +92,7 @@ function renderCategoryItems(cat) {
         el.dataset.itemId = item.id; 
         
         // MODIFIED: Changed this line to use an <img> tag for the image
-        el.innerHTML = `<div class="item-image"><img src="${item.image}" alt="${item.name}"></div><div class="item-content"><h3 class="item-name">${item.name}</h3><p class="item-description">${item.description}</p><p class="item-price">₹${item.price}</p><div class="item-controls"><div class="quantity-controls"><button class="quantity-btn" onclick="updateItemQuantity('${item.id}',-1)">-</button><span class="quantity-display">1</span><button class="quantity-btn" onclick="updateItemQuantity('${item.id}',1)">+</button></div><button class="add-to-cart-btn" onclick="addToCart('${item.id}','${currentCategory}')">Add to Cart</button></div></div>`; 
+        el.innerHTML = `<div class="item-image"><img src="${item.image}" alt="${item.name}"></div><div class="item-content"><h3 class="item-name">${item.name}</h3><p class="item-description">${item.description}</p><p class="item-price">₹${item.price}</p><div class="item-controls"><div class="quantity-controls"><button class="quantity-btn" onclick="updateItemQuantity('${item.id}',-1)">-</button><span class="quantity-display">1</span><button class="quantity-btn" onclick="updateItemQuantity('${item.id}',1)">+</button></div><button class="add-to-cart-btn" onclick="addToCart('${item.id}','${currentCategory}')" ${item.available === false ? 'disabled' : ''}>${item.available === false ? 'Sold Out' : 'Add to Cart'}</button></div></div>`; 
         
         grid.appendChild(el); 
     }); 